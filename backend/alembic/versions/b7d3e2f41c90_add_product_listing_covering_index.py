@@ -0,0 +1,40 @@
+"""Add covering index for product listing
+
+Revision ID: b7d3e2f41c90
+Revises: 0683916c9886
+Create Date: 2025-05-12 10:14:02.318406
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b7d3e2f41c90"
+down_revision: Union[str, None] = "0683916c9886"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        "ix_product_listing",
+        "products",
+        [
+            "is_deleted",
+            "is_active",
+            sa.text("created_at DESC"),
+            sa.text("id DESC"),
+        ],
+        unique=False,
+        postgresql_include=["name", "description", "category_id", "updated_at"],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_product_listing", table_name="products")
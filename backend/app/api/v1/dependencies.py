@@ -1,10 +1,15 @@
 """Shared dependencies used across version 1 API routes."""
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from app.models.users.user import User
 from app.core.security import get_current_user
 
 
+def get_client_host(request: Request) -> str:
+    """Return the caller's IP; a dependency so tests can override it."""
+    return request.client.host
+
+
 async def require_admin(current_user: User = Depends(get_current_user)) -> User:
     if not current_user.is_active or current_user.role.name.lower() != "admin":
         raise HTTPException(
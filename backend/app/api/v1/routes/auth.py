@@ -3,6 +3,7 @@
 from typing import Optional, Annotated
 import logging
 from fastapi import APIRouter, Depends, HTTPException, status, Request, Header
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from app.core.constants import TOKEN_TYPE_BEARER
 from app.core.security import (
@@ -13,8 +14,7 @@ from app.core.security import (
     create_activation_token,
     get_current_user,
     decode_access_token,
-    oauth2_scheme,
-    get_token_jti,
+    get_token_payload,
     TOKEN_BLACKLIST_PREFIX,
 )
 from app.core.validation import (
@@ -41,6 +41,7 @@ from app.schemas.auth import TokenResponse, UserLoginRequest, UserRegisterReques
 from app.schemas.users import UserResponse
 from datetime import datetime
 from app.services.auth_service import handle_register, handle_login, handle_logout
+from app.api.v1.dependencies import get_client_host
 
 
 settings = get_settings()
@@ -57,10 +58,10 @@ async def register_user(
     payload: UserRegisterRequest,
     request: Request,
     db: Annotated[Session, Depends(get_db)],
+    ip: Annotated[str, Depends(get_client_host)],
     user_agent: Optional[str] = Header(None),
     honeypot: Optional[str] = Header(None),
 ):
-    ip = request.client.host
     email = payload.email.strip().lower()
 
     # Honeypot check (can stay here if very lightweight)
@@ -70,13 +71,16 @@ async def register_user(
         )
         raise HTTPException(status_code=400, detail="Bot activity detected.")
 
-    user = handle_register(db, payload, ip)
+    # Sync DB work and bcrypt run off the event loop, so concurrent
+    # registrations proceed in parallel instead of queueing behind each other
+    user = await run_in_threadpool(handle_register, db, payload, ip)
 
     logger.info(
         "[REGISTER] User registered",
         extra={"ip": ip, "user_email": email, "user_agent": user_agent},
     )
-    return UserResponse.model_validate(user)
+    # response_model validates/serializes the ORM object once
+    return user
 
 
 @router.post("/login")
@@ -85,9 +89,9 @@ async def login_user(
     payload: UserLoginRequest,
     request: Request,
     db: Annotated[Session, Depends(get_db)],
+    ip: Annotated[str, Depends(get_client_host)],
     user_agent: Optional[str] = Header(None),
 ):
-    ip = request.client.host
     access_token, user = handle_login(db, payload, ip)
 
     logger.info(
@@ -102,12 +106,12 @@ async def login_user(
 async def logout_user(
     request: Request,
     db: Annotated[Session, Depends(get_db)],
-    token: Annotated[str, Depends(oauth2_scheme)],
+    payload: Annotated[dict, Depends(get_token_payload)],
     user: Annotated[User, Depends(get_current_user)],
+    ip: Annotated[str, Depends(get_client_host)],
     user_agent: Optional[str] = Header(None),
 ):
-    ip = request.client.host
-    handle_logout(token, user)
+    handle_logout(payload, user)
 
     logger.info(
         "[LOGOUT] User logged out",
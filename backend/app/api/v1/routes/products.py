@@ -25,6 +25,7 @@ async def list_products(
     sort_dir: Literal["asc", "desc"] = "desc",
     is_active: Optional[bool] = None,
     include_deleted: Optional[bool] = False,
+    category_id: Optional[int] = Query(default=None, description="Filter by category."),
     limit: int = Query(default=10, ge=0, le=100, description="Number of products per page."),
     offset: int = Query(default=0, ge=0, description="Offset index for pagination."),
     search: Optional[str] = Query(default=None, description="Search by product name."),
@@ -36,7 +37,7 @@ async def list_products(
     - Supports searching by name
     - Filters by active/inactive
     - Optionally includes soft-deleted products
-    - Future-proof for category and other metadata filters
+    - Filters by category
     """
     products, total = list_products_service(
         db,
@@ -45,6 +46,7 @@ async def list_products(
         search=search,
         is_active=is_active,
         include_deleted=include_deleted,
+        category_id=category_id,
         sort_dir=sort_dir
     )
 
@@ -69,6 +69,7 @@ async def get_user_profile(
         current_user_id=current_user.id,
         target_user_id=user_id,
         current_user_role=current_user.role.name,
+        current_user=current_user,
     )
     return user
 
@@ -113,4 +114,4 @@ async def delete_user_profile(
     deleted_user = service_delete_user(
         db, target_user_id=id, acting_user_id=admin_user.id
     )
-    return UserResponse.model_validate(deleted_user)
+    return deleted_user
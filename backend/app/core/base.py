@@ -38,6 +38,12 @@ class BaseConfig(BaseSettings):
     JWT_ALGORITHM: str
     JWT_ACCESS_TOKEN_EXPIRE_MINUTES: int
 
+    # Root/audit log level; the test suite raises it to WARNING
+    LOG_LEVEL: str = "INFO"
+
+    # Password hashing cost (bcrypt log2 rounds); the test suite lowers it to 4
+    BCRYPT_ROUNDS: int = 12
+
     # Tells Pydantic to treat values as case-sensitive
     # and load from UTF-8 encoded `.env` files
     model_config = SettingsConfigDict(env_file_encoding="utf-8")
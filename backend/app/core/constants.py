@@ -5,3 +5,5 @@ TOKEN_TYPE_BEARER = "bearer"  # noqa: S105
 LOGIN_RATE_LIMIT_PREFIX = "login:rate"
 REGISTER_RATE_LIMIT_PREFIX = "register:rate"
 TOKEN_BLACKLIST_PREFIX = "blacklist:"
+USER_ID_CACHE_PREFIX = "uid:"
+USER_ID_CACHE_TTL_SECONDS = 60
@@ -7,12 +7,13 @@ from pathlib import Path
 LOG_DIR = Path("logs")
 LOG_DIR.mkdir(exist_ok=True)
 
-def setup_logging():
+def setup_logging(level: str = "INFO"):
     """
     Set up application-wide structured logging for stdout and file.
+    `level` applies to the root and audit loggers (e.g. WARNING under tests).
     """
     logger = logging.getLogger()
-    logger.setLevel(logging.INFO)
+    logger.setLevel(level)
 
     formatter = jsonlogger.JsonFormatter(
         "%(asctime)s %(levelname)s %(name)s %(message)s %(ip)s %(user_email)s %(request_id)s"
@@ -32,5 +33,5 @@ def setup_logging():
     audit_handler = RotatingFileHandler(LOG_DIR / "audit.log", maxBytes=5*1024*1024, backupCount=3)
     audit_handler.setFormatter(formatter)
     audit_logger = logging.getLogger("audit")
-    audit_logger.setLevel(logging.INFO)
+    audit_logger.setLevel(level)
     audit_logger.addHandler(audit_handler)
\ No newline at end of file
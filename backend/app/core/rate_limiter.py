@@ -7,16 +7,32 @@ settings = get_settings()
 MAX_REQUESTS = 5
 WINDOW_SECONDS = 60
 
-def check_rate_limit(prefix: str,ip: str) -> bool:
+
+def rate_limit_key(prefix: str, ip: str) -> str:
+    """
+    Build the Redis key for a prefix/IP pair. Format once per request and reuse.
+    """
+    return f"{prefix}:{ip}"
+
+
+def record_attempt(key: str) -> None:
+    """
+    Count one attempt against a key and (re)arm its window in a single round trip.
+    """
+    pipe = r.pipeline()
+    pipe.incr(key)
+    pipe.expire(key, WINDOW_SECONDS)
+    pipe.execute()
+
+
+def check_rate_limit(key: str) -> bool:
     """
-    Limit number of requests from a single IP within a fixed window.
+    Limit number of requests for a prebuilt rate-limit key within a fixed window.
     """
     if settings.ENVIRONMENT == "test" or settings.ENVIRONMENT == "development":
         return True  # skip rate limiting in tests
-    key = f"{prefix}:{ip}"
     current = r.get(key)
     if current and int(current) >= MAX_REQUESTS:
         return False
-    r.incr(key)
-    r.expire(key, WINDOW_SECONDS)
+    record_attempt(key)
     return True
@@ -18,12 +18,14 @@ from app.models.users.activation_key import ActivationKey
 import uuid
 import re
 
-# Initialize password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
 # Load global settings (from config.py)
 settings = get_settings()
 
+# Initialize password hashing context
+pwd_context = CryptContext(
+    schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS
+)
+
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 TOKEN_BLACKLIST_PREFIX = "blacklist:"
 
@@ -144,18 +146,28 @@ def decode_access_token(token: str) -> dict:
         )
 
 
+def get_token_payload(token: str = Depends(oauth2_scheme)) -> dict:
+    """
+    Verified claims of the request's bearer token.
+
+    FastAPI caches dependencies per request, so routes that need the claims
+    as well as the user (e.g. logout) share this single decode.
+    """
+    return decode_access_token(token)
+
+
 # --- Auth Dependency ---
 def get_current_user(
-    token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)
+    payload: dict = Depends(get_token_payload), db: Session = Depends(get_db)
 )-> User:
-    jti = get_token_jti(token)
+    jti = payload.get("jti")
+    if not jti:
+        raise HTTPException(status_code=401, detail="Invalid token payload.")
+
     # Check Redis blacklist
     if redis_client.get(f"{TOKEN_BLACKLIST_PREFIX}{jti}"):
         raise HTTPException(status_code=401, detail="Token has been revoked.")
 
-    # Decode JWT
-    payload = decode_access_token(token)
-
     user_id_raw: Optional[int] = payload.get("sub")
     try:
         user_id = int(user_id_raw)
@@ -168,26 +180,3 @@ def get_current_user(
         raise HTTPException(status_code=401, detail="Inactive or missing user.")
 
     return user
-
-
-def get_token_jti(token: str) -> str:
-    """
-    Extract the 'jti' (JWT ID) from the given JWT access token.
-
-    Args:
-        token (str): JWT access token.
-
-    Returns:
-        str: The extracted 'jti' value.
-
-    Raises:
-        ValueError: If the token is invalid or 'jti' is missing.
-    """
-    try:
-        payload = decode_access_token(token)
-        jti = payload.get("jti")
-        if not jti:
-            raise ValueError("Token missing 'jti' claim.")
-        return jti
-    except JWTError as e:
-        raise ValueError(f"Invalid JWT token: {str(e)}")
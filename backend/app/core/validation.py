@@ -1,6 +1,11 @@
 import re
+from functools import lru_cache
+
 import dns.resolver
 
+_HTML_TAG_RE = re.compile(r"<[^>]+>")
+_UNSAFE_CHARS_RE = re.compile(r"[^\w\s\-'.]")
+
 def validate_email_mx(email: str) -> bool:
     """
     Validate email by checking MX DNS records for domain.
@@ -13,7 +18,7 @@ def validate_email_mx(email: str) -> bool:
         return False
 
 
-def is_disposable_email(email: str, blocklist: set[str]) -> bool:
+def is_disposable_email(email: str, blocklist: set[str] | frozenset[str]) -> bool:
     """
     Check if email belongs to known disposable domain list.
     """
@@ -21,12 +26,13 @@ def is_disposable_email(email: str, blocklist: set[str]) -> bool:
     return domain.lower() in blocklist
 
 
+@lru_cache(maxsize=2048)
 def sanitize_text(text: str) -> str:
     """
     Remove tags and special symbols to prevent XSS/SQLi via names.
     """
-    clean = re.sub(r"<[^>]+>", "", text)  # strip HTML
-    clean = re.sub(r"[^\w\s\-'.]", "", clean)  # strip unsafe chars
+    clean = _HTML_TAG_RE.sub("", text)  # strip HTML
+    clean = _UNSAFE_CHARS_RE.sub("", clean)  # strip unsafe chars
     return clean.strip()
 
 
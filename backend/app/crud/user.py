@@ -1,6 +1,7 @@
 """CRUD operations related to the User model."""
 
-from sqlalchemy.orm import Session
+from sqlalchemy import exists, update
+from sqlalchemy.orm import Session, aliased, joinedload, lazyload, selectinload
 from sqlalchemy.exc import IntegrityError
 from fastapi import HTTPException, status
 from typing import Optional, List
@@ -56,12 +57,11 @@ def create_user(
 
 
 def get_user_by_id(db: Session, user_id: int) -> User | None:
-    """Retrieve a user by their ID from the database."""
-    return (
-        db.query(User)
-        .filter(User.id == user_id, User.is_active == True, User.is_deleted == False)
-        .first()
-    )
+    """Retrieve an active, non-deleted user by primary key (identity map first)."""
+    user = db.get(User, user_id)
+    if user is None or not user.is_active or user.is_deleted:
+        return None
+    return user
 
 
 def increment_login_attempts(db: Session, user: User):
@@ -85,12 +85,24 @@ def list_users(
     is_active: Optional[bool],
     sort_by: str,
     sort_dir: str,
+    with_relations: bool = False,
 ) -> (List[User], int):
     """
     Fetch a paginated, filtered, sorted list of users.
+
+    The model's selectin relationship defaults are skipped, so a plain listing
+    costs a single SELECT plus the count. With `with_relations`, role is joined
+    and reported_bugs is batch-loaded in one extra SELECT, with nothing nested.
     """
     query = db.query(User).filter(User.is_deleted == False)
 
+    if with_relations:
+        query = query.options(
+            joinedload(User.role).lazyload("*"),
+            selectinload(User.reported_bugs).lazyload("*"),
+        )
+    query = query.options(lazyload("*"))
+
     if search:
         search_term = f"%{search.lower()}%"
         query = query.filter(
@@ -112,13 +124,28 @@ def list_users(
     return users, total
 
 
-def update_user_fields(db: Session, user: User, update_data: dict) -> User:
+def update_user_fields(db: Session, user_id: int, update_data: dict) -> User | None:
     """
-    Update provided fields for a user and commit to DB.
+    Update provided fields for an active user in a single UPDATE ... RETURNING.
+
+    When the payload changes the email, the statement only matches if no other
+    user already owns it. Returns None when nothing was updated (missing user
+    or email taken); callers decide which by re-checking on that path only.
     """
-    for field, value in update_data.items():
-        setattr(user, field, value)
+    stmt = update(User).where(
+        User.id == user_id, User.is_active == True, User.is_deleted == False
+    )
+    if "email" in update_data:
+        taken = aliased(User)
+        stmt = stmt.where(
+            ~exists().where(taken.email.ilike(update_data["email"]), taken.id != user_id)
+        )
+    stmt = stmt.values(**update_data).returning(User)
+
     try:
+        user = db.execute(stmt).scalar_one_or_none()
+        if user is None:
+            return None
         db.commit()
         db.refresh(user)
     except IntegrityError as e:
@@ -134,12 +161,8 @@ def soft_delete_user(db: Session, target_user_id: int) -> Optional[User]:
     """
     Soft-delete (deactivate) a user by setting is_deleted=True.
     """
-    user = (
-        db.query(User)
-        .filter(User.id == target_user_id, User.is_deleted == False)
-        .first()
-    )
-    if not user:
+    user = db.get(User, target_user_id)
+    if not user or user.is_deleted:
         return None
     user.is_active = True
     user.is_deleted = True
@@ -13,7 +13,7 @@ import logging
 
 # Configuration loading
 settings = get_settings()
-setup_logging()
+setup_logging(settings.LOG_LEVEL)
 
 VERSION_ONE_PREFIX = "/api/v1"
 
@@ -22,7 +22,6 @@ class Product(Base):
     """
 
     __tablename__ = "products"
-    __table_args__ = (Index("ix_product_name", "name"),)  # Support fast lookup by name
 
     id = Column(Integer, primary_key=True)
 
@@ -65,6 +64,20 @@ class Product(Base):
         lazy="selectin",
     )
 
+    __table_args__ = (
+        Index("ix_product_name", "name"),  # Support fast lookup by name
+        # Covering index for the listing endpoint: filter + keyed ORDER BY, with
+        # the returned and filtered columns INCLUDEd so Postgres can serve it index-only
+        Index(
+            "ix_product_listing",
+            "is_deleted",
+            "is_active",
+            created_at.desc(),
+            id.desc(),
+            postgresql_include=["name", "description", "category_id", "updated_at"],
+        ),
+    )
+
     def __repr__(self) -> str:
         """Debug representation for use in logs or admin tooling."""
         return f"<Product id={self.id} name='{self.name}' active={self.is_active}>"
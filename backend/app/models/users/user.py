@@ -79,7 +79,11 @@ class User(Base):
     # Unique constraint workaround for soft delete
     __table_args__ = (
         Index(
-            "uq_users_email_active", "email", postgresql_where=~is_deleted, unique=True
+            "uq_users_email_active",
+            "email",
+            unique=True,
+            postgresql_where=~is_deleted,
+            sqlite_where=~is_deleted,  # keep the same semantics on the SQLite test DB
         ),
     )
 
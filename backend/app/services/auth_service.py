@@ -1,9 +1,10 @@
 """Business logic services for authentication operations."""
 
 import logging
+import time
 from sqlalchemy.orm import Session
 from fastapi import HTTPException
-from datetime import datetime
+from redis.exceptions import RedisError
 from typing import Optional
 from app.crud.user import (
     get_user_by_email,
@@ -12,17 +13,19 @@ from app.crud.user import (
     reset_login_attempts,
 )
 from app.services.email import send_activation_email
+from app.services.user_cache import (
+    get_user_by_email_cached,
+    invalidate_user_email_cache,
+)
 from app.core.security import (
     create_access_token,
     create_activation_token,
     hash_password,
     validate_password_strength,
     verify_password,
-    decode_access_token,
-    get_token_jti,
 )
 from app.core.validation import is_disposable_email, validate_email_mx, sanitize_text
-from app.core.rate_limiter import check_rate_limit
+from app.core.rate_limiter import check_rate_limit, rate_limit_key, record_attempt
 from app.core.constants import (
     LOGIN_RATE_LIMIT_PREFIX,
     REGISTER_RATE_LIMIT_PREFIX,
@@ -34,21 +37,19 @@ from app.core import get_settings
 settings = get_settings()
 logger = logging.getLogger("audit")
 
-DISPOSABLE_DOMAINS = {"tempmail.com", "10minutemail.com", "mailinator.com"}
+DISPOSABLE_DOMAINS = frozenset({"tempmail.com", "10minutemail.com", "mailinator.com"})
 
 
 def handle_register(db: Session, payload, ip: str):
     """
     Handle user registration including validation, creation, and sending activation email.
     """
-    email = payload.email.strip().lower()
-    full_name = sanitize_text(payload.full_name) if payload.full_name else None
-
-    # Validate incoming registration request
-    if not check_rate_limit(REGISTER_RATE_LIMIT_PREFIX, ip):
+    # Checks run cheapest first so rejected requests never reach DNS or the DB
+    if not check_rate_limit(rate_limit_key(REGISTER_RATE_LIMIT_PREFIX, ip)):
         logger.warning("[REGISTER_FAIL] Rate limit exceeded", extra={"ip": ip})
         raise HTTPException(status_code=429, detail="Too many requests from this IP.")
 
+    email = payload.email.strip().lower()
     if is_disposable_email(email, DISPOSABLE_DOMAINS):
         raise HTTPException(status_code=400, detail="Disposable email not allowed.")
 
@@ -62,9 +63,11 @@ def handle_register(db: Session, payload, ip: str):
     if not validate_password_strength(payload.password):
         raise HTTPException(status_code=422, detail="Password is too weak.")
 
-    # Create user
+    # Create user (sanitize only once every rejection check has passed)
+    full_name = sanitize_text(payload.full_name) if payload.full_name else None
     hashed_pw = hash_password(payload.password)
     user = create_user(db, payload, hashed_pw, full_name)
+    invalidate_user_email_cache(email)
 
     # Email activation
     token = create_activation_token(
@@ -80,16 +83,16 @@ def handle_login(db: Session, payload, ip: str):
     Handle user authentication and return JWT token.
     """
     email = payload.email.strip().lower()
+    rl_key = rate_limit_key(LOGIN_RATE_LIMIT_PREFIX, ip)
 
     # Validate login attempts
-    if not check_rate_limit(LOGIN_RATE_LIMIT_PREFIX, ip):
+    if not check_rate_limit(rl_key):
         logger.warning("[LOGIN_FAIL] Rate limit exceeded", extra={"ip": ip})
         raise HTTPException(status_code=429, detail="Too many login attempts.")
 
-    user = get_user_by_email(db, email)
+    user = get_user_by_email_cached(db, email)
     if not user or user.is_deleted:
-        redis_client.incr(f"{LOGIN_RATE_LIMIT_PREFIX}:{ip}")
-        redis_client.expire(f"{LOGIN_RATE_LIMIT_PREFIX}:{ip}", 60)
+        record_attempt(rl_key)
         logger.warning("[LOGIN_FAIL] Invalid credentials", extra={"ip": ip})
         raise HTTPException(status_code=401, detail="Invalid credentials.")
 
@@ -99,8 +102,7 @@ def handle_login(db: Session, payload, ip: str):
 
     if not verify_password(payload.password, user.hashed_password):
         increment_login_attempts(db, user)
-        redis_client.incr(f"{LOGIN_RATE_LIMIT_PREFIX}:{ip}")
-        redis_client.expire(f"{LOGIN_RATE_LIMIT_PREFIX}:{ip}", 60)
+        record_attempt(rl_key)
         logger.warning("[LOGIN_FAIL] Incorrect password", extra={"email": email})
         raise HTTPException(status_code=401, detail="Invalid credentials.")
 
@@ -112,12 +114,15 @@ def handle_login(db: Session, payload, ip: str):
     return token, user
 
 
-def handle_logout(token: str, user):
+def handle_logout(payload: dict, user):
     """
     Handle user logout by blacklisting the JWT.
+    Takes the already-verified token claims so the token isn't decoded twice.
     """
-    payload = decode_access_token(token)
-    jti = get_token_jti(token)
+    jti = payload.get("jti")
+    if not jti:
+        logger.warning("[LOGOUT_FAIL] Missing jti in token", extra={"user_id": user.id})
+        raise HTTPException(status_code=401, detail="Invalid token payload.")
     exp_timestamp = payload.get("exp")
 
     if not exp_timestamp:
@@ -126,15 +131,15 @@ def handle_logout(token: str, user):
         )
         raise HTTPException(status_code=400, detail="Token missing expiration")
 
-    ttl = exp_timestamp - int(datetime.utcnow().timestamp())
+    ttl = exp_timestamp - int(time.time())
     if ttl <= 0:
         logger.info("[LOGOUT] Token already expired", extra={"user_id": user.id})
         return
 
     redis_key = f"{TOKEN_BLACKLIST_PREFIX}{jti}"
-    if redis_client:
+    try:
         redis_client.setex(redis_key, ttl, "true")
-        logger.info("[LOGOUT] Token blacklisted", extra={"user_id": user.id})
-    else:
+    except RedisError:
         logger.warning("[LOGOUT] Redis unavailable", extra={"user_id": user.id})
         raise HTTPException(status_code=503, detail="Logout temporarily unavailable")
+    logger.info("[LOGOUT] Token blacklisted", extra={"user_id": user.id})
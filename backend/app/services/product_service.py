@@ -1,4 +1,4 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, lazyload, load_only
 from typing import List, Optional, Tuple
 from app.models.products.product import Product
 from sqlalchemy import asc, desc
@@ -10,13 +10,27 @@ def list_products_service(
     search: Optional[str] = None,
     is_active: Optional[bool] = None,
     include_deleted: bool = False,
+    category_id: Optional[int] = None,
     sort_dir: str = "desc",
 ) -> Tuple[List[Product], int]:
     """
     Business logic for listing paginated, searchable products.
     Returns (products_list, total_count).
     """
-    query = db.query(Product)
+    # Only the ProductOut columns, all of which ix_product_listing keys or
+    # INCLUDEs, and no relationship loads, so Postgres can scan index-only
+    query = db.query(Product).options(
+        load_only(
+            Product.id,
+            Product.name,
+            Product.description,
+            Product.is_active,
+            Product.is_deleted,
+            Product.created_at,
+            Product.updated_at,
+        ),
+        lazyload("*"),
+    )
 
     if not include_deleted:
         query = query.filter(Product.is_deleted == False)
@@ -24,15 +38,20 @@ def list_products_service(
     if is_active is not None:
         query = query.filter(Product.is_active == is_active)
 
+    if category_id is not None:
+        query = query.filter(Product.category_id == category_id)
+
     if search:
         query = query.filter(Product.name.ilike(f"%{search}%"))
 
     total = query.count()
 
-    sort_order = desc(Product.created_at) if sort_dir == "desc" else asc(Product.created_at)
+    # id breaks created_at ties and matches the ix_product_listing key order
+    direction = desc if sort_dir == "desc" else asc
+    sort_order = (direction(Product.created_at), direction(Product.id))
 
     products = (
-        query.order_by(sort_order)
+        query.order_by(*sort_order)
         .limit(limit)
         .offset(offset)
         .all()
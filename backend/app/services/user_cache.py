@@ -0,0 +1,56 @@
+"""Short-lived Redis cache mapping login emails to user ids."""
+
+import logging
+
+from redis.exceptions import RedisError
+from sqlalchemy.orm import Session
+
+from app.core.constants import USER_ID_CACHE_PREFIX, USER_ID_CACHE_TTL_SECONDS
+from app.core.redis import redis_client
+from app.crud.user import get_user_by_email
+from app.models.users.user import User
+
+logger = logging.getLogger("audit")
+
+
+def get_user_by_email_cached(db: Session, email: str) -> User | None:
+    """
+    Resolve a user by email, using a cached id for a primary-key load on hit.
+
+    Only the id is cached: the row itself is always read from the DB, so flags
+    like is_active/is_deleted are never stale. A cached id whose row no longer
+    carries this email is ignored and the regular lookup is used instead.
+    Redis errors are treated as a miss, so login only depends on the DB.
+    """
+    key = f"{USER_ID_CACHE_PREFIX}{email}"
+
+    try:
+        cached_id = redis_client.get(key)
+    except RedisError:
+        logger.warning("[USER_CACHE] Redis unavailable on read", extra={"email": email})
+        cached_id = None
+
+    if cached_id:
+        user = db.get(User, int(cached_id))
+        if user and user.email.lower() == email:
+            return user
+
+    user = get_user_by_email(db, email)
+    if user:
+        try:
+            redis_client.setex(key, USER_ID_CACHE_TTL_SECONDS, user.id)
+        except RedisError:
+            logger.warning("[USER_CACHE] Redis unavailable on write", extra={"email": email})
+    return user
+
+
+def invalidate_user_email_cache(email: str) -> None:
+    """
+    Drop the cached id for an email after the owning row changes.
+
+    A failed delete is safe to skip: lookups re-check the row's email.
+    """
+    try:
+        redis_client.delete(f"{USER_ID_CACHE_PREFIX}{email.strip().lower()}")
+    except RedisError:
+        logger.warning("[USER_CACHE] Redis unavailable on invalidate", extra={"email": email})
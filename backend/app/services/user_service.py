@@ -5,34 +5,44 @@ from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
 from app.crud.user import (
     get_user_by_id,
-    get_user_by_email,
     list_users,
     update_user_fields,
     soft_delete_user,
 )
+from app.models.users.user import User
 from app.schemas.users import UserUpdateIn
+from app.services.user_cache import invalidate_user_email_cache
 from datetime import datetime, timezone
 
 logger = logging.getLogger("audit")
 
 
-def service_list_users(db: Session, **filters):
+def service_list_users(db: Session, with_relations: bool = False, **filters):
     """
     Business service to list users with optional filtering and sorting.
+    Pass `with_relations=True` when the caller serializes role/bug data.
     """
-    users, total = list_users(db, **filters)
+    users, total = list_users(db, with_relations=with_relations, **filters)
     logger.info("[USER_LIST] Listed users", extra={"user_count": len(users)})
     return users, total
 
 
 def service_get_user_profile(
-    db: Session, current_user_id: int, target_user_id: int, current_user_role: str
+    db: Session,
+    current_user_id: int,
+    target_user_id: int,
+    current_user_role: str,
+    current_user: User | None = None,
 ):
     """
     Business service to retrieve user profile.
     Admins can view any profile; users can view only their own.
+    Pass the already-authenticated `current_user` to skip the lookup on self-views.
     """
-    user = get_user_by_id(db, user_id=target_user_id)
+    if current_user is not None and current_user.id == target_user_id:
+        user = current_user
+    else:
+        user = get_user_by_id(db, user_id=target_user_id)
     if not user:
         logger.warning(
             "[USER_FETCH_FAIL] User not found", extra={"target_user_id": target_user_id}
@@ -64,18 +74,14 @@ def service_update_user_profile(db: Session, id: int, user_update: UserUpdateIn)
     Business service to update a user's profile.
     Ensures email uniqueness check and updates provided fields.
     """
-    user = get_user_by_id(db, user_id=id)
-    if not user:
-        logger.warning("[USER_UPDATE_FAIL] User not found", extra={"user_id": id})
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="User not found."
-        )
-
-    update_data = user_update.dict(exclude_unset=True)
-
-    if "email" in update_data:
-        existing_user = get_user_by_email(db, update_data["email"])
-        if existing_user and existing_user.id != id:
+    update_data = user_update.model_dump(exclude_unset=True)
+    update_data["updated_at"] = datetime.now(timezone.utc)
+
+    updated_user = update_user_fields(db, id, update_data)
+    if not updated_user:
+        # Only an email change can be refused while the user still exists; any
+        # other miss means the user was deactivated or deleted meanwhile
+        if "email" in update_data and get_user_by_id(db, user_id=id):
             logger.warning(
                 "[EMAIL_CONFLICT] Email already taken",
                 extra={"email": update_data["email"]},
@@ -84,8 +90,13 @@ def service_update_user_profile(db: Session, id: int, user_update: UserUpdateIn)
                 status_code=status.HTTP_409_CONFLICT, detail="Email already registered."
             )
 
-    user.updated_at = datetime.now(timezone.utc)
-    updated_user = update_user_fields(db, user, update_data)
+        logger.warning("[USER_UPDATE_FAIL] User not found", extra={"user_id": id})
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="User not found."
+        )
+
+    if "email" in update_data:
+        invalidate_user_email_cache(update_data["email"])
 
     logger.info("[USER_UPDATE] User profile updated", extra={"user_id": id})
     return updated_user
@@ -115,6 +126,8 @@ def service_delete_user(db: Session, target_user_id: int, acting_user_id: int):
             status_code=status.HTTP_404_NOT_FOUND, detail="User not found."
         )
 
+    invalidate_user_email_cache(deleted_user.email)
+
     logger.info(
         "[USER_DELETE] User soft-deleted", extra={"deleted_user_id": target_user_id}
     )
@@ -1,48 +1,192 @@
 """Pytest fixtures for setting up and tearing down the test database and client."""
 
+import itertools
+import os
+import threading
+import time
+
+import fakeredis
+import httpx
 import pytest
+import uvicorn
+import pytest_asyncio
 from fastapi.testclient import TestClient
+from sqlalchemy import insert, text
 from sqlalchemy.orm import Session
 
-from app.db import TestingSessionLocal, test_engine
+# Set BUGZOT_FAST_HASH=0 to run the suite against the production-cost hasher.
+# Must be exported before the app's settings are first loaded.
+FAST_HASH = os.getenv("BUGZOT_FAST_HASH", "1") != "0"
+if FAST_HASH:
+    os.environ["BCRYPT_ROUNDS"] = "4"
+# Nothing asserts on the app's INFO/audit lines; don't format and write them
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+from app.core import redis as app_redis
+
+# Swap in an in-process Redis before anything does `from app.core.redis import
+# redis_client`, so every module (and every xdist worker) gets its own fake.
+app_redis.redis_client = fakeredis.FakeStrictRedis(decode_responses=True)
+
+from app.db import TEST_DB_WORKER, TestingSessionLocal, test_engine, test_is_memory
 from app.db.base import Base
-from app.db.init_db import seed_roles
+from app.db.init_db import DEFAULT_ROLES
 from app.db.session import get_db
-from app.models.users.user import User
 from app.main import app
-from tests.utils import register, login, get_token_from_response
+from app.core.security import create_access_token, hash_password
+from app.models.users import Role, User
+from tests.utils import login, get_token_from_response, make_email_str, seed_user
+from tests.utils_jwt import auth_header
+
+SEEDED_USER_NAMES = ("retest", "duplicate", "resend")
+SEEDED_USER_PASSWORD = "StrongPass123!"
+SEEDED_USER_ID_BASE = 900_000
+USER_POOL_SIZE = 8
+USER_POOL_ID_BASE = 910_000
+ADMIN_USER_ID = 920_000
+ADMIN_ROLE_ID = 3
+# Domains the fake MX check reports as having no mail server; all others pass
+NO_MX_DOMAINS = frozenset({"invalidtld.test", "nxdomain.test"})
+# Request-id logging and CORS do nothing the tests assert on; skip them per request
+DISABLED_TEST_MIDDLEWARE = ("LoggingContextMiddleware", "CORSMiddleware")
 
 
 @pytest.fixture(scope="session", autouse=True)
 def setup_database() -> None:
-    """Initialize the test database and seed roles once per session."""
-    Base.metadata.drop_all(bind=test_engine)
-    Base.metadata.create_all(bind=test_engine)
+    """Initialize the test database and seed roles once per session (per worker)."""
+    if TEST_DB_WORKER and test_engine.dialect.name == "postgresql":
+        with test_engine.begin() as conn:
+            conn.execute(text(f'CREATE SCHEMA IF NOT EXISTS "{TEST_DB_WORKER}"'))
 
-    db = TestingSessionLocal()
-    try:
-        seed_roles(db)
-        db.commit()
-    finally:
-        db.close()
+    # Schema and role seed go out on one connection in a single transaction.
+    # Existing tables are kept and emptied rather than dropped and re-created.
+    with test_engine.begin() as conn:
+        Base.metadata.create_all(bind=conn, checkfirst=True)
+        if not test_is_memory:
+            _empty_tables(conn)
+        conn.execute(insert(Role), DEFAULT_ROLES)
 
     yield
 
-    Base.metadata.drop_all(bind=test_engine)
+    # An in-memory database disappears with the process; nothing to drop
+    if not test_is_memory:
+        Base.metadata.drop_all(bind=test_engine)
+
+
+def _empty_tables(conn) -> None:
+    """Remove leftover rows from a persistent test database in as few statements as possible."""
+    tables = Base.metadata.sorted_tables
+    if conn.dialect.name == "postgresql":
+        names = ", ".join(f'"{table.name}"' for table in tables)
+        conn.execute(text(f"TRUNCATE {names} RESTART IDENTITY CASCADE"))
+    else:
+        for table in reversed(tables):
+            conn.execute(table.delete())
+
+
+@pytest.fixture(scope="session", autouse=True)
+def fake_mx_lookup() -> None:
+    """Answer register's MX check from NO_MX_DOMAINS instead of live DNS."""
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(
+            "app.services.auth_service.validate_email_mx",
+            lambda email: email.rsplit("@", 1)[-1].lower() not in NO_MX_DOMAINS,
+        )
+        yield
+
+
+@pytest.fixture(scope="session")
+def seeded_users(setup_database) -> dict[str, str]:
+    """Commit a few pre-existing accounts once per session, keyed by short name.
+
+    Tests that only need "an account with this email already exists" use these
+    instead of registering through the HTTP stack first.
+    """
+    emails = {name: make_email_str(f"seeded.{name}") for name in SEEDED_USER_NAMES}
+    hashed = hash_password(SEEDED_USER_PASSWORD)
+    with TestingSessionLocal() as db:
+        # Ids sit far above the sequence so tests that assume low ids (or that
+        # user 1 doesn't exist yet) are unaffected by these rows
+        db.add_all(
+            User(
+                id=SEEDED_USER_ID_BASE + offset,
+                email=email,
+                hashed_password=hashed,
+                role_id=1,
+                is_active=True,
+            )
+            for offset, email in enumerate(emails.values())
+        )
+        db.commit()
+    return emails
+
+
+@pytest.fixture(scope="session")
+def user_pool(setup_database) -> list[tuple[str, str]]:
+    """Commit a pool of active accounts in one INSERT and hand out (email, password) pairs.
+
+    Login tests that only need "some valid user" pick an entry by index rather
+    than seeding (and hashing for) their own account each time.
+    """
+    hashed = hash_password(SEEDED_USER_PASSWORD)
+    rows = [
+        {
+            "id": USER_POOL_ID_BASE + i,
+            "email": make_email_str(f"pool{i}"),
+            "hashed_password": hashed,
+            "role_id": 1,
+            "is_active": True,
+        }
+        for i in range(USER_POOL_SIZE)
+    ]
+    with TestingSessionLocal() as db:
+        db.execute(insert(User), rows)
+        db.commit()
+    return [(row["email"], SEEDED_USER_PASSWORD) for row in rows]
+
+
+@pytest.fixture(scope="session")
+def admin_header(setup_database) -> dict[str, str]:
+    """Commit one admin account per session and return its bearer header.
+
+    Tests that only need "an admin calls this endpoint" use it instead of
+    registering and logging in a fresh admin each time. Tests that delete or
+    modify the admin itself must still create their own.
+    """
+    with TestingSessionLocal() as db:
+        db.add(
+            User(
+                id=ADMIN_USER_ID,
+                email=make_email_str("session.admin"),
+                hashed_password=hash_password(SEEDED_USER_PASSWORD),
+                role_id=ADMIN_ROLE_ID,
+                is_active=True,
+            )
+        )
+        db.commit()
+    token = create_access_token(data={"sub": str(ADMIN_USER_ID)})
+    return {"Authorization": f"Bearer {token}"}
 
 
 @pytest.fixture(autouse=True)
-def cleanup_db(db_session):
-    db_session.query(User).delete()
-    db_session.commit()
+def _flush_redis() -> None:
+    """Start every test with an empty fake Redis (blacklist, rate limits, caches)."""
+    yield
+    app_redis.redis_client.flushdb()
 
 
 @pytest.fixture
 def db_session() -> Session:
-    """Return a fresh DB session per test using transaction rollback."""
+    """Return a DB session per test, joined to an outer transaction.
+
+    Commits and rollbacks inside the test only release/roll back a SAVEPOINT,
+    so every write is discarded by the single outer rollback at teardown.
+    """
     connection = test_engine.connect()
     transaction = connection.begin()
-    session = TestingSessionLocal(bind=connection)
+    session = TestingSessionLocal(
+        bind=connection, join_transaction_mode="create_savepoint"
+    )
 
     try:
         yield session
@@ -52,22 +196,102 @@ def db_session() -> Session:
         connection.close()
 
 
+@pytest.fixture(scope="session", autouse=True)
+def _lean_middleware() -> None:
+    """Strip DISABLED_TEST_MIDDLEWARE from the app for the whole session."""
+    original = app.user_middleware
+    app.user_middleware = [
+        m for m in original if m.cls.__name__ not in DISABLED_TEST_MIDDLEWARE
+    ]
+    app.middleware_stack = None  # rebuilt from user_middleware on the next request
+    yield
+    app.user_middleware = original
+    app.middleware_stack = None
+
+
+@pytest.fixture(scope="session")
+def _client() -> TestClient:
+    """Build one FastAPI test client (and run app startup once) per session."""
+    with TestClient(app) as c:
+        yield c
+
+
 @pytest.fixture
-def client(db_session: Session) -> TestClient:
-    """Return a FastAPI test client with DB dependency overridden."""
+def client(_client: TestClient, db_session: Session) -> TestClient:
+    """Return the shared test client with the DB dependency bound to this test."""
 
     def override_get_db() -> Session:
         yield db_session
 
     app.dependency_overrides[get_db] = override_get_db
-    return TestClient(app)
+    yield _client
+    app.dependency_overrides.pop(get_db, None)
+
+
+@pytest_asyncio.fixture
+async def async_client(db_session: Session) -> httpx.AsyncClient:
+    """Return an httpx client dispatching straight into the app on the test's loop."""
+
+    def override_get_db() -> Session:
+        yield db_session
+
+    app.dependency_overrides[get_db] = override_get_db
+    transport = httpx.ASGITransport(app=app)
+    # Follow redirects like TestClient does (e.g. /products -> /products/)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://testserver", follow_redirects=True
+    ) as c:
+        yield c
+    app.dependency_overrides.pop(get_db, None)
+
+
+@pytest.fixture(scope="session")
+def live_server_url(_client: TestClient) -> str:
+    """Serve the app with uvicorn on an ephemeral port for real concurrent requests.
+
+    The session client has already run the app's lifespan, so uvicorn skips it.
+    """
+    server = uvicorn.Server(
+        uvicorn.Config(
+            app, host="127.0.0.1", port=0, log_level="warning", lifespan="off"
+        )
+    )
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+
+    port = server.servers[0].sockets[0].getsockname()[1]
+    yield f"http://127.0.0.1:{port}"
+
+    server.should_exit = True
+    thread.join(timeout=5)
 
 
 @pytest.fixture
-def token_valid_user(client):
-    """Creates a valid user and returns access token."""
-    email = "tokenuser@example.com"
+def token_valid_user(client: TestClient, db_session: Session) -> str:
+    """Seed a user in this test's transaction and return a fresh access token for it."""
+    email = make_email_str("tokenuser")
     password = "StrongPass123!"
-    register(client, email, password)
+    seed_user(db_session, email, password)
     res = login(client, email, password)
     return get_token_from_response(res)
+
+
+@pytest.fixture
+def auth_as(db_session: Session):
+    """Return a factory that seeds a user in this test's transaction.
+
+    `auth_as(role_id, email=None)` gives back `(user_id, bearer_header)` with a
+    minted token, for tests that act as a specific (not shared) user.
+    """
+    counter = itertools.count()
+
+    def _auth_as(
+        role_id: int = ADMIN_ROLE_ID, email: str | None = None
+    ) -> tuple[int, dict[str, str]]:
+        email = email or make_email_str(f"authas.{role_id}.{next(counter)}")
+        user = seed_user(db_session, email, SEEDED_USER_PASSWORD, role_id=role_id)
+        return user.id, auth_header(user.id)
+
+    return _auth_as
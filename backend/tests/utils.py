@@ -1,20 +1,25 @@
 """Utility functions for testing user registration and login."""
 
+from functools import lru_cache
+
+import httpx
+import orjson
 from fastapi.testclient import TestClient
+from sqlalchemy import select, update
 from sqlalchemy.orm import Session
 from starlette.responses import Response
-from jose import jwt
-import time
+from app.core import security
 from app.models.products import Product
-from app.db.session import get_db
+from app.models.users.user import User
 import random
 import string
-from datetime import datetime, timedelta
-from app.core import get_settings
 
-settings = get_settings()
+
+# Register and login payloads are serialized with orjson and sent as raw content
+JSON_HEADERS = {"content-type": "application/json"}
 
 
+@lru_cache(maxsize=None)
 def make_email_str(username: str) -> str:
     return f"{username}@protonmail.com"
 
@@ -28,47 +33,112 @@ def register(
     active: bool = True,
 ) -> Response:
     """Register a new user with optional role_id (for testing purposes)."""
+    payload = _register_payload(email, password, full_name, role_id, active)
+    return client.post(
+        "/api/v1/auth/register", content=orjson.dumps(payload), headers=JSON_HEADERS
+    )
+
+
+@lru_cache(maxsize=256)
+def _norm_email(email: str) -> str:
+    """Strip surrounding whitespace; duplicate/race tests reuse the same strings."""
+    return email.strip()
+
+
+def _register_payload(
+    email: str, password: str, full_name: str | None, role_id: int, active: bool
+) -> dict:
     payload = {
-        "email": email.strip(),
+        "email": _norm_email(email),
         "password": password,
         "role_id": role_id,
         "active": active,
     }
     if full_name is not None:
         payload["full_name"] = full_name
-    return client.post("/api/v1/auth/register", json=payload)
+    return payload
+
+
+async def register_async(
+    client: httpx.AsyncClient,
+    email: str,
+    password: str,
+    full_name: str | None = None,
+    role_id: int = 1,
+    active: bool = True,
+) -> httpx.Response:
+    """Register a new user through the async ASGI client."""
+    payload = _register_payload(email, password, full_name, role_id, active)
+    return await client.post(
+        "/api/v1/auth/register", content=orjson.dumps(payload), headers=JSON_HEADERS
+    )
+
+
+@lru_cache(maxsize=256)
+def _login_body(email: str, password: str) -> bytes:
+    """Serialize a login body once per (email, password); tests log in repeatedly."""
+    return orjson.dumps({"email": email, "password": password})
 
 
 def login(client: TestClient, email: str, password: str) -> Response:
     """Log in a user."""
     return client.post(
         "/api/v1/auth/login",
-        json={"email": email, "password": password},
+        content=_login_body(email, password),
+        headers=JSON_HEADERS,
     )
 
 
-def get_user_from_db(db: Session, email: str) -> object | None:
-    """Fetch user from the database by email."""
-    from app.models.users.user import User
-
-    return db.query(User).filter(User.email == email.lower()).first()
+async def login_async(
+    client: httpx.AsyncClient, email: str, password: str
+) -> httpx.Response:
+    """Log in a user through the async ASGI client."""
+    return await client.post(
+        "/api/v1/auth/login",
+        content=_login_body(email, password),
+        headers=JSON_HEADERS,
+    )
 
 
-def login(client: TestClient, email: str, password: str):
-    """
-    Send a login request.
+# Hash each distinct test password once per session
+_CACHED_HASH: dict[str, str] = {}
 
-    Args:
-        client (TestClient): FastAPI test client.
-        email (str): User email.
-        password (str): User password.
 
-    Returns:
-        Response: The HTTP response from the login endpoint.
-    """
-    return client.post(
-        "/api/v1/auth/login", json={"email": email, "password": password}
+def seed_user(
+    db: Session,
+    email: str,
+    password: str,
+    *,
+    active: bool = True,
+    deleted: bool = False,
+    role_id: int = 1,
+) -> User:
+    """Insert a user row directly, for tests that only need the account to exist."""
+    if password not in _CACHED_HASH:
+        _CACHED_HASH[password] = security.hash_password(password)
+    user = User(
+        email=email.strip().lower(),
+        hashed_password=_CACHED_HASH[password],
+        role_id=role_id,
+        is_active=active,
+        is_deleted=deleted,
     )
+    db.add(user)
+    db.commit()
+    return user
+
+
+def set_user_flags(db: Session, email: str, **values) -> None:
+    """Change columns on an existing user with one UPDATE, without loading the row."""
+    db.execute(update(User).where(User.email == email.lower()).values(**values))
+    db.commit()
+
+
+def get_user_from_db(db: Session, email: str) -> object | None:
+    """Fetch user from the database by email."""
+    return db.execute(
+        select(User).where(User.email == email.lower())
+    ).scalar_one_or_none()
 
 
 def logout(client: TestClient, token: str):
@@ -87,6 +157,13 @@ def logout(client: TestClient, token: str):
     )
 
 
+async def logout_async(client: httpx.AsyncClient, token: str) -> httpx.Response:
+    """Send a logout request through the async ASGI client."""
+    return await client.post(
+        "/api/v1/auth/logout", headers={"Authorization": f"Bearer {token}"}
+    )
+
+
 def get_token_from_response(res) -> str:
     """
     Extract access token from login response.
@@ -108,29 +185,6 @@ def get_user_token_header(res):
     return {"Authorization": f"Bearer {res.json()["access_token"]}"}
 
 
-def create_test_token(user_id: int, expire_in_minutes: int = 15, secret_override: str = None) -> str:
-    """
-    Helper function to create a JWT token for testing purposes.
-    
-    Args:
-        user_id (int): ID of the user for whom the token is generated.
-        expire_in_minutes (int): Minutes after which the token expires. Defaults to 15 minutes.
-        secret_override (str): If provided, use this instead of default secret (used for invalid signature tests).
-
-    Returns:
-        str: Encoded JWT token.
-    """
-    secret = secret_override or settings.JWT_SECRET_KEY
-    now = datetime.utcnow()
-    payload = {
-        "sub": str(user_id),
-        "exp": now + timedelta(minutes=expire_in_minutes),
-        "iat": now,
-        "jti": f"test-jti-{time.time()}"  # simple unique jti
-    }
-    token = jwt.encode(payload, secret, algorithm="HS256")
-    return token
-
 def make_product(db, name=None, description=None, is_active=True, is_deleted=False, category_id=None):
     """
     Quickly create a test Product in the database.
@@ -0,0 +1,40 @@
+"""JWT helpers for tests that need hand-crafted access tokens."""
+
+import time
+
+from jose import jwt
+
+from app.core import get_settings
+
+settings = get_settings()
+
+
+def create_test_token(user_id: int, expire_in_minutes: int = 15, secret_override: str = None) -> str:
+    """
+    Helper function to create a JWT token for testing purposes.
+    
+    Args:
+        user_id (int): ID of the user for whom the token is generated.
+        expire_in_minutes (int): Minutes after which the token expires. Defaults to 15 minutes.
+        secret_override (str): If provided, use this instead of default secret (used for invalid signature tests).
+
+    Returns:
+        str: Encoded JWT token.
+    """
+    secret = secret_override or settings.JWT_SECRET_KEY
+    # One clock read; integer claims skip jose's datetime -> timestamp conversion
+    now_ns = time.time_ns()
+    iat = now_ns // 1_000_000_000
+    payload = {
+        "sub": str(user_id),
+        "exp": iat + expire_in_minutes * 60,
+        "iat": iat,
+        "jti": f"test-jti-{now_ns}"  # simple unique jti
+    }
+    token = jwt.encode(payload, secret, algorithm="HS256")
+    return token
+
+
+def auth_header(user_id: int) -> dict[str, str]:
+    """Bearer header with a freshly minted token, for tests that don't exercise /login."""
+    return {"Authorization": f"Bearer {create_test_token(user_id)}"}
@@ -0,0 +1,71 @@
+"""Shared fixtures for the auth endpoint tests."""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from jose import jwt
+from sqlalchemy import select
+
+from app.core import get_settings
+from app.core.security import create_access_token
+from app.db import TestingSessionLocal
+from app.models.users import User
+
+settings = get_settings()
+
+# user_pool entry reserved for tests that only need "a valid token"
+AUTHED_POOL_INDEX = 7
+
+
+@pytest.fixture
+def redis_client():
+    """Return the app's Redis client, resolved when a test asks for it."""
+    from app.core.redis import redis_client as client
+
+    return client
+
+
+@pytest.fixture(scope="session")
+def authed_token(user_pool) -> tuple[str, str]:
+    """Return (email, access token) for a pooled user, minted once per session."""
+    email, _ = user_pool[AUTHED_POOL_INDEX]
+    with TestingSessionLocal() as db:
+        user_id = db.scalar(select(User.id).where(User.email == email))
+    return email, create_access_token(data={"sub": str(user_id)})
+
+
+@pytest.fixture(scope="session")
+def make_token():
+    """Return an encoder with the signing key and algorithm bound once per session.
+
+    Claims go in as keyword arguments; pass `_key` to sign with a different secret.
+    """
+    key = settings.JWT_SECRET_KEY
+    alg = settings.JWT_ALGORITHM
+
+    def _make(_key: str = key, **claims) -> str:
+        return jwt.encode(claims, _key, algorithm=alg)
+
+    return _make
+
+
+@pytest.fixture(scope="session")
+def malformed_tokens(make_token) -> dict[str, str]:
+    """Encode the synthetic bad tokens once per session, keyed by what is wrong with them."""
+    now = datetime.now(timezone.utc)
+    expired = int((now - timedelta(minutes=1)).timestamp())
+    valid_until = int((now + timedelta(minutes=10)).timestamp())
+
+    return {
+        "expired": make_token(sub="1", exp=expired, jti="expired-jti"),
+        "no_jti": make_token(sub="1", exp=valid_until),
+        "no_exp": make_token(sub="1", jti="missing-exp-jti"),
+        "no_sub": make_token(exp=valid_until, jti="missing-sub"),
+        "nonexistent_user": make_token(
+            sub="9999999", exp=valid_until, jti="fakeuser-jti"
+        ),
+        "tampered": make_token(_key="WRONG_SECRET", sub="1", jti="tampered"),
+        "bad_sig": make_token(
+            _key="badkey", sub="1", exp=valid_until, jti="invalid-key"
+        ),
+    }
@@ -0,0 +1,42 @@
+import pytest
+from fastapi.testclient import TestClient
+from starlette.status import HTTP_401_UNAUTHORIZED, HTTP_422_UNPROCESSABLE_ENTITY
+from tests.utils import login
+
+pytestmark = pytest.mark.security
+
+# -----------------------
+# 🔐 Security Test Cases
+# -----------------------
+
+# (email, password) that must never authenticate anyone
+MALICIOUS_LOGINS = [
+    pytest.param("' OR 1=1--", "password", id="sql_injection_email"),
+    pytest.param("sqlinj@example.com", "' OR 'a'='a", id="sql_injection_password"),
+    pytest.param("' OR 1=1 --", "Nope123!", id="tc_40_sql_injection_in_email"),
+    pytest.param(
+        "<script>alert(1)</script>", "<script>123</script>",
+        id="tc_41_xss_script_input",
+    ),
+]
+
+
+@pytest.mark.parametrize("email,password", MALICIOUS_LOGINS)
+def test_login_malicious_input(client: TestClient, email, password):
+    res = login(client, email, password)
+    assert res.status_code in (HTTP_401_UNAUTHORIZED, HTTP_422_UNPROCESSABLE_ENTITY)
+
+
+@pytest.mark.parametrize(
+    "password",
+    [
+        pytest.param("' OR 'a'='a", id="sql_injection_password_existing_user"),
+        pytest.param("' OR 1=1 --", id="sql_comment_password_existing_user"),
+    ],
+)
+def test_login_malicious_password_for_existing_user(
+    client: TestClient, user_pool, password
+):
+    email, _ = user_pool[5]
+    res = login(client, email, password)
+    assert res.status_code == HTTP_401_UNAUTHORIZED
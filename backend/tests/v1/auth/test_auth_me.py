@@ -1,28 +1,16 @@
-import pytest
 from fastapi.testclient import TestClient
-from starlette.status import HTTP_200_OK, HTTP_401_UNAUTHORIZED, HTTP_403_FORBIDDEN, HTTP_422_UNPROCESSABLE_ENTITY
-import time
-from jose import jwt
-from datetime import datetime, timedelta, timezone
-from app.core import get_settings
-from app.main import app
+from starlette.status import HTTP_200_OK, HTTP_401_UNAUTHORIZED, HTTP_422_UNPROCESSABLE_ENTITY
 from tests.utils import register, login, get_token_from_response, make_email_str
 
 ENDPOINT = "/api/v1/auth/me"
 
-client = TestClient(app)
-settings = get_settings()
-
 # -------------------------------
 # ✅ Positive Test Cases
 # -------------------------------
 
-def test_tc_01_me_valid_token(client: TestClient):
+def test_tc_01_me_valid_token(client: TestClient, authed_token):
     """Valid token, active user — should return 200 and user info."""
-    email = make_email_str("validuser")
-    register(client, email, "StrongPass123!", "Test User")
-    res = login(client, email, "StrongPass123!")
-    token = get_token_from_response(res)
+    email, token = authed_token
 
     me = client.get(ENDPOINT, headers={"Authorization": f"Bearer {token}"})
     assert me.status_code == HTTP_200_OK
@@ -42,24 +30,18 @@ def test_tc_02_me_mixed_case_email(client: TestClient):
     assert me.json()["email"] == normalized
 
 
-def test_tc_03_me_no_full_name(client: TestClient):
+def test_tc_03_me_no_full_name(client: TestClient, authed_token):
     """No full_name provided during registration — should return full_name: null."""
-    email = make_email_str("nofull")
-    register(client, email, "StrongPass123!")
-    res = login(client, email, "StrongPass123!")
-    token = get_token_from_response(res)
+    email, token = authed_token
 
     me = client.get(ENDPOINT, headers={"Authorization": f"Bearer {token}"})
     assert me.status_code == HTTP_200_OK
     assert me.json().get("full_name") in (None, "")
 
 
-def test_tc_04_me_mobile_user_agent(client: TestClient):
+def test_tc_04_me_mobile_user_agent(client: TestClient, authed_token):
     """Mobile user-agent — should succeed and be auditable if logging is enabled."""
-    email = make_email_str("mobileagent")
-    register(client, email, "StrongPass123!")
-    res = login(client, email, "StrongPass123!")
-    token = get_token_from_response(res)
+    email, token = authed_token
 
     headers = {
         "Authorization": f"Bearer {token}",
@@ -71,12 +53,9 @@ def test_tc_04_me_mobile_user_agent(client: TestClient):
     assert me.json()["email"] == email
 
 
-def test_tc_05_me_user_recent_login(client: TestClient, db_session):
+def test_tc_05_me_user_recent_login(client: TestClient, authed_token):
     """After login, last_login should be updated (or audit log contains timestamp)."""
-    email = make_email_str("recentlogin")
-    register(client, email, "StrongPass123!")
-    res = login(client, email, "StrongPass123!")
-    token = get_token_from_response(res)
+    email, token = authed_token
 
     me = client.get(ENDPOINT, headers={"Authorization": f"Bearer {token}"})
     assert me.status_code == HTTP_200_OK
@@ -99,27 +78,23 @@ def test_tc_11_invalid_jwt_format(client: TestClient):
     assert res.status_code in [HTTP_401_UNAUTHORIZED, HTTP_422_UNPROCESSABLE_ENTITY]
 
 
-def test_tc_12_token_missing_sub(client: TestClient):
-    token = jwt.encode(
-        {"exp": datetime.utcnow() + timedelta(minutes=5), "jti": "missing-sub"},
-        settings.JWT_SECRET_KEY,
-        algorithm="HS256"
-    )
+def test_tc_12_token_missing_sub(client: TestClient, malformed_tokens: dict):
+    token = malformed_tokens["no_sub"]
 
     headers = {"Authorization": f"Bearer {token}"}
     res = client.get(ENDPOINT, headers=headers)
     assert res.status_code == HTTP_401_UNAUTHORIZED
 
 
-def test_tc_13_token_expired(client: TestClient):
-    token = jwt.encode({"sub": "1", "exp": datetime.utcnow() - timedelta(seconds=5)}, settings.JWT_SECRET_KEY, algorithm="HS256")
+def test_tc_13_token_expired(client: TestClient, malformed_tokens: dict):
+    token = malformed_tokens["expired"]
     headers = {"Authorization": f"Bearer {token}"}
     res = client.get(ENDPOINT, headers=headers)
     assert res.status_code == HTTP_401_UNAUTHORIZED
 
 
-def test_tc_14_token_wrong_secret(client: TestClient):
-    token = jwt.encode({"sub": "1", "exp": datetime.utcnow() + timedelta(minutes=5)}, "wrongsecret", algorithm="HS256")
+def test_tc_14_token_wrong_secret(client: TestClient, malformed_tokens: dict):
+    token = malformed_tokens["bad_sig"]
     headers = {"Authorization": f"Bearer {token}"}
     res = client.get(ENDPOINT, headers=headers)
     assert res.status_code == HTTP_401_UNAUTHORIZED
@@ -1,153 +1,243 @@
+import asyncio
+
+import httpx
 import pytest
-from fastapi.testclient import TestClient
 from starlette.status import (
     HTTP_201_CREATED,
     HTTP_400_BAD_REQUEST,
     HTTP_409_CONFLICT,
     HTTP_422_UNPROCESSABLE_ENTITY,
 )
+from app.db import TestingSessionLocal, test_is_memory
+from app.db.session import get_db
 from app.main import app
-from tests.utils import register, make_email_str
+from app.models.users.user import User
+from tests.utils import register_async, make_email_str
+
+pytestmark = pytest.mark.asyncio(loop_scope="session")
+
+REGISTER_ENDPOINT = "/api/v1/auth/register"
+
+# Single-request cases: (email, password, full_name, expected_status, expected_json_subset)
+REGISTER_CASES = [
+    # ✅ Positive
+    pytest.param(
+        make_email_str("user1"), "StrongPass123!", "John Doe",
+        HTTP_201_CREATED, {"email": "user1@protonmail.com"},
+        id="tc_01_register_valid_user",
+    ),
+    pytest.param(
+        "  USER@Protonmail.Com  ", "StrongPass123!", None,
+        HTTP_201_CREATED, {"email": "user@protonmail.com"},  # normalized
+        id="tc_02_register_email_with_whitespace_and_uppercase",
+    ),
+    pytest.param(
+        make_email_str("namedemail"), "StrongPass123!", "Named User",
+        HTTP_201_CREATED, {"full_name": "Named User"},
+        id="tc_03_register_with_optional_full_name",
+    ),
+    pytest.param(
+        "domaincheck@protonmail.com", "StrongPass123!", None,
+        HTTP_201_CREATED, {},
+        id="tc_06_register_with_valid_non_disposable_domain",
+    ),
+    # ❌ Negative
+    pytest.param(
+        "weakpass@example.com", "123", None,
+        HTTP_422_UNPROCESSABLE_ENTITY, {},
+        id="tc_12_weak_password",
+    ),
+    pytest.param(
+        "invalid-email", "StrongPass123!", None,
+        HTTP_422_UNPROCESSABLE_ENTITY, {},
+        id="tc_14_invalid_email_format",
+    ),
+    pytest.param(
+        "nxdomain@invalidtld.test", "StrongPass123!", None,
+        HTTP_422_UNPROCESSABLE_ENTITY, {},
+        id="tc_15_email_no_mx",
+    ),
+    pytest.param(
+        "temp@tempmail.com", "StrongPass123!", None,
+        HTTP_400_BAD_REQUEST, {},
+        id="tc_16_disposable_email",
+    ),
+    # 📐 Edge
+    pytest.param(
+        make_email_str("minpass"), "Aa1!aaaa", None,
+        HTTP_201_CREATED, {},
+        id="tc_21_password_min_boundary",
+    ),
+    pytest.param(
+        make_email_str("john+test_user"), "StrongPass123!", None,
+        HTTP_201_CREATED, {},
+        id="tc_22_email_with_symbols",
+    ),
+    # 🔐 Security
+    pytest.param(
+        make_email_str("sql"), "StrongPass123!", "Robert'); DROP TABLE users;--",
+        HTTP_201_CREATED, {},
+        id="tc_40_sql_injection_attempt",
+        marks=pytest.mark.security,
+    ),
+    pytest.param(
+        # This is a theoretical test; you would inspect logs manually or mock logging
+        make_email_str("logtest"), "SensitivePass123!", None,
+        HTTP_201_CREATED, {},
+        id="tc_44_password_not_logged",
+    ),
+]
+
+# Raw request cases bypassing the register() helper: (json, headers, expected_status)
+RAW_REGISTER_CASES = [
+    pytest.param(
+        {"password": "StrongPass123!"}, None,
+        HTTP_422_UNPROCESSABLE_ENTITY,
+        id="tc_10_missing_email",
+    ),
+    pytest.param(
+        {"email": "missingpass@example.com"}, None,
+        HTTP_422_UNPROCESSABLE_ENTITY,
+        id="tc_11_missing_password",
+    ),
+    pytest.param(
+        {"email": "bot@caught.com", "password": "StrongPass123!"},
+        {"honeypot": "gotcha"},  # Simulate bot behavior
+        HTTP_400_BAD_REQUEST,
+        id="tc_17_honeypot_trigger",
+    ),
+    pytest.param(
+        {"email": "botfill@fail.com", "password": "StrongPass123!", "full_name": "I am bot"},
+        {"honeypot": "filled"},
+        HTTP_400_BAD_REQUEST,
+        id="tc_43_bot_fills_all_fields",
+    ),
+    pytest.param(
+        {"email": make_email_str("real"), "password": "StrongPass123!"},
+        {"X-Email": "fake@example.com"},
+        HTTP_201_CREATED,
+        id="tc_45_forged_email_header",
+    ),
+]
+
+
+@pytest.mark.parametrize("email,password,full_name,status,expect", REGISTER_CASES)
+async def test_register(
+    async_client: httpx.AsyncClient, email, password, full_name, status, expect
+):
+    res = await register_async(async_client, email, password, full_name)
+    assert res.status_code == status
+    body = res.json()
+    for key, value in expect.items():
+        assert body[key] == value
+
+
+@pytest.mark.parametrize("payload,headers,status", RAW_REGISTER_CASES)
+async def test_register_raw_request(
+    async_client: httpx.AsyncClient, payload, headers, status
+):
+    res = await async_client.post(REGISTER_ENDPOINT, json=payload, headers=headers)
+    assert res.status_code == status
 
-client = TestClient(app)
 
 # -----------------------
 # ✅ Positive Test Cases
 # -----------------------
-def test_tc_01_register_valid_user(client: TestClient):
-    res = register(client, make_email_str("user1"), "StrongPass123!", "John Doe")
-    assert res.status_code == HTTP_201_CREATED
-    assert res.json()["email"] == "user1@protonmail.com"
-
-
-def test_tc_02_register_email_with_whitespace_and_uppercase(client: TestClient):
-    res = register(client, "  USER@Protonmail.Com  ", "StrongPass123!")
-    assert res.status_code == HTTP_201_CREATED
-    assert res.json()["email"] == "user@protonmail.com"  # normalized
-
-
-def test_tc_03_register_with_optional_full_name(client: TestClient):
-    res = register(client, make_email_str("namedemail"), "StrongPass123!", "Named User")
-    assert res.status_code == HTTP_201_CREATED
-    assert res.json()["full_name"] == "Named User"
-
-
-def test_tc_04_register_without_full_name(client: TestClient):
-    res = register(client, make_email_str("noname"), "StrongPass123!")
+async def test_tc_04_register_without_full_name(async_client: httpx.AsyncClient):
+    res = await register_async(async_client, make_email_str("noname"), "StrongPass123!")
     assert res.status_code == HTTP_201_CREATED
     assert res.json().get("full_name") in (None, "")
 
 
-def test_tc_05_re_register_after_failed_previous(client: TestClient):
-    email = make_email_str("retest")
-    register(client, email, "StrongPass123!")
-    res = register(client, email, "StrongPass123!")  # should trigger 409 Conflict or resend logic
+async def test_tc_05_re_register_after_failed_previous(
+    async_client: httpx.AsyncClient, seeded_users
+):
+    email = seeded_users["retest"]
+    res = await register_async(async_client, email, "StrongPass123!")  # should trigger 409 Conflict or resend logic
     assert res.status_code in (HTTP_409_CONFLICT, HTTP_201_CREATED)
 
 
-def test_tc_06_register_with_valid_non_disposable_domain(client: TestClient):
-    res = register(client, "domaincheck@protonmail.com", "StrongPass123!")
-    assert res.status_code == HTTP_201_CREATED
-
-
 # -----------------------
 # ❌ Negative Test Cases
 # -----------------------
-
-def test_tc_10_missing_email(client: TestClient):
-    res = client.post("/api/v1/auth/register", json={"password": "StrongPass123!"})
-    assert res.status_code == HTTP_422_UNPROCESSABLE_ENTITY
-
-
-def test_tc_11_missing_password(client: TestClient):
-    res = client.post("/api/v1/auth/register", json={"email": "missingpass@example.com"})
-    assert res.status_code == HTTP_422_UNPROCESSABLE_ENTITY
-
-
-def test_tc_12_weak_password(client: TestClient):
-    res = register(client, "weakpass@example.com", "123")
-    assert res.status_code == HTTP_422_UNPROCESSABLE_ENTITY
-
-
-def test_tc_13_duplicate_email(client: TestClient):
-    email = make_email_str("duplicate")
-    register(client, email, "StrongPass123!")
-    res = register(client, email, "StrongPass123!")
+async def test_tc_13_duplicate_email(async_client: httpx.AsyncClient, seeded_users):
+    email = seeded_users["duplicate"]
+    res = await register_async(async_client, email, "StrongPass123!")
     assert res.status_code == HTTP_409_CONFLICT
 
 
-def test_tc_14_invalid_email_format(client: TestClient):
-    res = register(client, "invalid-email", "StrongPass123!")
-    assert res.status_code == HTTP_422_UNPROCESSABLE_ENTITY
-
-
-def test_tc_15_email_no_mx(client: TestClient):
-    res = register(client, "nxdomain@invalidtld.test", "StrongPass123!")
-    assert res.status_code == HTTP_422_UNPROCESSABLE_ENTITY
-
-
-def test_tc_16_disposable_email(client: TestClient):
-    res = register(client, "temp@tempmail.com", "StrongPass123!")
-    assert res.status_code == HTTP_400_BAD_REQUEST
-
-
-def test_tc_17_honeypot_trigger(client: TestClient):
-    headers = {"honeypot": "gotcha"}  # Simulate bot behavior
-    res = client.post("/api/v1/auth/register", json={"email": "bot@caught.com", "password": "StrongPass123!"}, headers=headers)
-    assert res.status_code == HTTP_400_BAD_REQUEST
-
 # -----------------------
 # 📐 Edge Test Cases
 # -----------------------
-def test_tc_21_password_min_boundary(client: TestClient):
-    res = register(client, make_email_str("minpass"), "Aa1!aaaa")
-    assert res.status_code == HTTP_201_CREATED
-
-def test_tc_22_email_with_symbols(client: TestClient):
-    res = register(client, make_email_str("john+test_user"), "StrongPass123!")
-    assert res.status_code == HTTP_201_CREATED
-
-def test_tc_23_full_name_with_unicode(client: TestClient):
-    res = register(client, make_email_str("unicode"), "StrongPass123!", "Jöhn 🚀")
+async def test_tc_23_full_name_with_unicode(async_client: httpx.AsyncClient):
+    res = await register_async(async_client, make_email_str("unicode"), "StrongPass123!", "Jöhn 🚀")
     assert res.status_code == HTTP_201_CREATED
     assert "Jöhn" in res.json()["full_name"]
 
 # -----------------------
 # 🔁 Corner Test Cases
 # -----------------------
-def test_tc_31_resend_token_for_same_email(client: TestClient):
-    register(client, make_email_str("resend"), "StrongPass123!")
-    res2 = register(client, make_email_str("resend"), "StrongPass123!")
+async def test_tc_31_resend_token_for_same_email(
+    async_client: httpx.AsyncClient, seeded_users
+):
+    res2 = await register_async(async_client, seeded_users["resend"], "StrongPass123!")
     assert res2.status_code in (HTTP_409_CONFLICT, HTTP_201_CREATED)
 
-def test_tc_33_script_tag_in_name(client: TestClient):
-    res = register(client, make_email_str("xssname"), "StrongPass123!", "<script>alert(1)</script>")
-    assert res.status_code == HTTP_201_CREATED
-    assert "<script>" not in res.json()["full_name"]
-
-# -----------------------
-# 🔐 Security Test Cases
-# -----------------------
-def test_tc_40_sql_injection_attempt(client: TestClient):
-    res = register(client, make_email_str("sql"), "StrongPass123!", "Robert'); DROP TABLE users;--")
-    assert res.status_code == HTTP_201_CREATED
 
-def test_tc_41_xss_in_full_name(client: TestClient):
-    res = register(client, make_email_str("xss"), "StrongPass123!", "<script>alert('xss')</script>")
+@pytest.mark.parametrize(
+    "username,full_name",
+    [
+        pytest.param("xssname", "<script>alert(1)</script>", id="tc_33_script_tag_in_name"),
+        pytest.param(
+            "xss", "<script>alert('xss')</script>",
+            id="tc_41_xss_in_full_name", marks=pytest.mark.security,
+        ),
+    ],
+)
+async def test_script_tags_stripped_from_name(
+    async_client: httpx.AsyncClient, username, full_name
+):
+    res = await register_async(async_client, make_email_str(username), "StrongPass123!", full_name)
     assert res.status_code == HTTP_201_CREATED
     assert "<script>" not in res.json()["full_name"]
 
-def test_tc_43_bot_fills_all_fields(client: TestClient):
-    headers = {"honeypot": "filled"}
-    res = client.post("/api/v1/auth/register", json={"email": "botfill@fail.com", "password": "StrongPass123!", "full_name": "I am bot"}, headers=headers)
-    assert res.status_code == HTTP_400_BAD_REQUEST
-
-def test_tc_44_password_not_logged(client: TestClient):
-    # This is a theoretical test; you would inspect logs manually or mock logging
-    res = register(client, make_email_str("logtest"), "SensitivePass123!")
-    assert res.status_code == HTTP_201_CREATED
 
-def test_tc_45_forged_email_header(client: TestClient):
-    headers = {"X-Email": "fake@example.com"}
-    res = client.post("/api/v1/auth/register", json={"email": make_email_str("real"), "password": "StrongPass123!"}, headers=headers)
-    assert res.status_code == HTTP_201_CREATED
+@pytest.mark.slow
+@pytest.mark.skipif(
+    test_is_memory, reason="In-memory SQLite shares one connection; nothing can race"
+)
+async def test_tc_34_race_condition_same_email(monkeypatch, live_server_url: str):
+    email = make_email_str("race")
+    # Skip the email pre-check so both inserts reach uq_users_email_active
+    monkeypatch.setattr(
+        "app.services.auth_service.get_user_by_email", lambda db, email: None
+    )
+
+    def independent_session():
+        # Each request gets its own session/connection and commits for real
+        db = TestingSessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = independent_session
+    try:
+        async with httpx.AsyncClient(base_url=live_server_url) as c:
+            r1, r2 = await asyncio.gather(
+                register_async(c, email, "StrongPass123!"),
+                register_async(c, email, "StrongPass123!"),
+            )
+
+        # The loser is rejected by the unique index, not the pre-check's 409
+        statuses = sorted([r1.status_code, r2.status_code])
+        assert statuses == [HTTP_201_CREATED, HTTP_400_BAD_REQUEST]
+
+        with TestingSessionLocal() as db:
+            assert db.query(User).filter(User.email == email).count() == 1
+    finally:
+        app.dependency_overrides.pop(get_db, None)
+        with TestingSessionLocal() as db:
+            for user in db.query(User).filter(User.email == email):
+                db.delete(user)
+            db.commit()
@@ -0,0 +1,49 @@
+"""Shared fixtures for the product endpoint tests."""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import insert
+
+from app.db import TestingSessionLocal
+from app.models.products.product import Product
+
+PRODUCT_CATALOG_SIZE = 20
+MAX_NAME = "A" * 100
+MAX_DESCRIPTION = "D" * 255
+
+
+@pytest.fixture(scope="session")
+def product_catalog(setup_database) -> dict[str, tuple[int, str]]:
+    """Commit a fixed catalog once per session and return (id, name) keyed by label.
+
+    "max_length" carries column-limit name/description; "plain" has no relations;
+    the rest are filler so listing/pagination tests have enough rows to page over.
+    Rows get distinct created_at values, newest first in name order, so sorting by
+    created_at never coincides with sorting by name.
+    """
+    rows = [
+        {"name": MAX_NAME, "description": MAX_DESCRIPTION},
+        {"name": "BugZot Seed Plain", "description": "Test description"},
+    ] + [
+        {"name": f"BugZot Seed {i:02d}", "description": "Test description"}
+        for i in range(PRODUCT_CATALOG_SIZE - 2)
+    ]
+    seeded_at = datetime.now(timezone.utc) - timedelta(days=1)
+    for i, row in enumerate(rows):
+        row.update(
+            is_active=True,
+            is_deleted=False,
+            created_at=seeded_at - timedelta(minutes=i),
+        )
+
+    with TestingSessionLocal() as db:
+        result = db.execute(insert(Product).returning(Product.id, Product.name), rows)
+        products = [tuple(r) for r in result]
+        db.commit()
+
+    by_name = {name: (id_, name) for id_, name in products}
+    return {
+        "max_length": by_name[MAX_NAME],
+        "plain": by_name["BugZot Seed Plain"],
+    }
@@ -126,6 +126,7 @@ def test_tc_45_massively_large_limit(client):
     response = client.get(f"{ENDPOINT}?limit=1000000")
     assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
 
+@pytest.mark.slow
 @pytest.mark.skip(reason="Requires actual DoS mitigation like slowapi or custom middleware")
 def test_tc_46_dos_attack_burst(client):
     for _ in range(100):
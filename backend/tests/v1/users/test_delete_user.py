@@ -1,19 +1,14 @@
 import pytest
 from fastapi import status
-from datetime import datetime, timedelta, timezone
-from jose import jwt
 from tests.utils import (
     make_email_str,
     get_user_token_header,
     register,
     login,
-    create_test_token,
+    seed_user,
 )
-from app.core import get_settings
-from app.models.users.user import User
 
 ENDPOINT = "/api/v1/users"
-settings = get_settings()
 
 # --------------------------
 # Positive Test Cases
@@ -21,63 +16,46 @@ settings = get_settings()
 
 
 # TC_01 - Admin deletes an active user
-def test_tc_01_admin_deletes_active_user(client):
+def test_tc_01_admin_deletes_active_user(client, admin_header):
     email = make_email_str("activeuser")
     res1 = register(client, email, "Password123!", role_id=1)
     login(client, email, "Password123!")
     user_id = res1.json()["id"]
 
-    admin_email = make_email_str("admin")
-    register(client, admin_email, "Password123!", role_id=3)
-    admin_res2 = login(client, admin_email, "Password123!")
-    admin_token_header = get_user_token_header(admin_res2)
-
-    response = client.delete(f"{ENDPOINT}/{user_id}", headers=admin_token_header)
+    response = client.delete(f"{ENDPOINT}/{user_id}", headers=admin_header)
     assert response.status_code == status.HTTP_200_OK
     assert response.json()["id"] == user_id
     assert response.json()["deleted_at"] is not None
 
 
 # TC_02 - Admin deletes a user already soft-deleted
-def test_tc_02_admin_deletes_already_soft_deleted_user(client):
+def test_tc_02_admin_deletes_already_soft_deleted_user(client, admin_header):
     email = make_email_str("deleteduser")
     res1 = register(client, email, "Password123!", role_id=1)
     res2 = login(client, email, "Password123!")
     get_user_token_header(res2)
     user_id = res1.json()["id"]
 
-    admin_email = make_email_str("admin2")
-    register(client, admin_email, "Password123!", role_id=3)
-    admin_res2 = login(client, admin_email, "Password123!")
-    admin_token_header = get_user_token_header(admin_res2)
-
     # First delete (soft delete)
-    client.delete(f"{ENDPOINT}/{user_id}", headers=admin_token_header)
+    client.delete(f"{ENDPOINT}/{user_id}", headers=admin_header)
 
     # Second delete attempt
-    response = client.delete(f"{ENDPOINT}/{user_id}", headers=admin_token_header)
+    response = client.delete(f"{ENDPOINT}/{user_id}", headers=admin_header)
     assert response.status_code == status.HTTP_404_NOT_FOUND
 
 
 # TC_03 - Admin deletes an inactive user
-def test_tc_03_admin_deletes_inactive_user(client):
-    email = make_email_str("inactiveuser")
-    res1 = register(client, email, "Password123!", role_id=1)
-    res2 = login(client, email, "Password123!")
-    get_user_token_header(res2)
-    user_id = res1.json()["id"]
-
-    admin_email = make_email_str("admin3")
-    register(client, admin_email, "Password123!", role_id=3)
-    admin_res2 = login(client, admin_email, "Password123!")
-    admin_token_header = get_user_token_header(admin_res2)
+def test_tc_03_admin_deletes_inactive_user(client, db_session, admin_header):
+    user_id = seed_user(
+        db_session, make_email_str("inactiveuser"), "Password123!", role_id=1
+    ).id
 
     # Make user inactive manually
     client.put(
-        f"{ENDPOINT}/{user_id}", headers=admin_token_header, json={"is_active": False}
+        f"{ENDPOINT}/{user_id}", headers=admin_header, json={"is_active": False}
     )
 
-    response = client.delete(f"{ENDPOINT}/{user_id}", headers=admin_token_header)
+    response = client.delete(f"{ENDPOINT}/{user_id}", headers=admin_header)
     assert response.status_code == status.HTTP_200_OK
     assert response.json()["id"] == user_id
     assert response.json()["deleted_at"] is not None
@@ -88,23 +66,25 @@ def test_tc_03_admin_deletes_inactive_user(client):
 # --------------------------
 
 
-# TC_10 - Try to delete non-existent user
-def test_tc_10_delete_non_existent_user(client):
-    admin_email = make_email_str("admin4")
-    register(client, admin_email, "Password123!", role_id=3)
-    admin_res2 = login(client, admin_email, "Password123!")
-    admin_token_header = get_user_token_header(admin_res2)
+# Admin deletes by an id that is malformed (422) or matches no user (404)
+BAD_ID_CASES = [
+    pytest.param("999999", 404, id="tc_10_non_existent_user"),
+    pytest.param("invalid_id", 422, id="tc_13_invalid_id_format"),
+    pytest.param("0", 422, id="tc_20_user_id_zero"),
+    pytest.param(str(2**31 - 1), 404, id="tc_21_max_int_id"),
+    pytest.param("1;DROP TABLE users;", 422, id="tc_44_sql_injection_attempt"),
+]
 
-    response = client.delete(f"{ENDPOINT}/999999", headers=admin_token_header)
-    assert response.status_code == status.HTTP_404_NOT_FOUND
+
+@pytest.mark.parametrize("bad_id,expected", BAD_ID_CASES)
+def test_delete_bad_or_missing_id(client, admin_header, bad_id, expected):
+    response = client.delete(f"{ENDPOINT}/{bad_id}", headers=admin_header)
+    assert response.status_code == expected
 
 
 # TC_11 - Non-admin user tries to delete another user
-def test_tc_11_non_admin_deletes_user(client):
-    email1 = make_email_str("user1")
-    register(client, email1, "Password123!", role_id=1)
-    login1 = login(client, email1, "Password123!")
-    user1_token = get_user_token_header(login1)
+def test_tc_11_non_admin_deletes_user(client, auth_as):
+    _, user1_token = auth_as(1, make_email_str("user1"))
 
     email2 = make_email_str("user2")
     res2 = register(client, email2, "Password123!", role_id=1)
@@ -115,36 +95,16 @@ def test_tc_11_non_admin_deletes_user(client):
 
 
 # TC_12 - Admin tries to delete their own account
-def test_tc_12_admin_deletes_self(client):
-    admin_email = make_email_str("selfadmin")
-    res = register(client, admin_email, "Password123!", role_id=3)
-    login_res = login(client, admin_email, "Password123!")
-    admin_token = get_user_token_header(login_res)
-    admin_id = res.json()["id"]
+def test_tc_12_admin_deletes_self(client, auth_as):
+    admin_id, admin_token = auth_as(email=make_email_str("selfadmin"))
 
     response = client.delete(f"{ENDPOINT}/{admin_id}", headers=admin_token)
     assert response.status_code == status.HTTP_400_BAD_REQUEST
 
 
-# TC_13 - Provide invalid id format (e.g., string instead of int)
-def test_tc_13_delete_invalid_id_format(client):
-    admin_email = make_email_str("admin5")
-    register(client, admin_email, "Password123!", role_id=3)
-    login_res = login(client, admin_email, "Password123!")
-    admin_token = get_user_token_header(login_res)
-
-    response = client.delete(f"{ENDPOINT}/invalid_id", headers=admin_token)
-    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
-
-
 # TC_14 - Send DELETE with no ID (e.g., /users/)
-def test_tc_14_delete_no_id(client):
-    admin_email = make_email_str("admin6")
-    register(client, admin_email, "Password123!", role_id=3)
-    login_res = login(client, admin_email, "Password123!")
-    admin_token = get_user_token_header(login_res)
-
-    response = client.delete(f"{ENDPOINT}/", headers=admin_token)
+def test_tc_14_delete_no_id(client, admin_header):
+    response = client.delete(f"{ENDPOINT}/", headers=admin_header)
     assert response.status_code == status.HTTP_405_METHOD_NOT_ALLOWED
 
 
@@ -153,61 +113,25 @@ def test_tc_14_delete_no_id(client):
 # --------------------------
 
 
-# TC_20 - Delete user with id=0
-def test_tc_20_delete_user_id_zero(client):
-    admin_email = make_email_str("admin_edge0")
-    register(client, admin_email, "Password123!", role_id=3)
-    login_res = login(client, admin_email, "Password123!")
-    admin_token = get_user_token_header(login_res)
-
-    response = client.delete(f"{ENDPOINT}/0", headers=admin_token)
-    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
-
-
-# TC_21 - Delete user with maximum allowed int ID (2^31-1)
-def test_tc_21_delete_max_int_id(client):
-    admin_email = make_email_str("admin_maxint")
-    register(client, admin_email, "Password123!", role_id=3)
-    login_res = login(client, admin_email, "Password123!")
-    admin_token = get_user_token_header(login_res)
-
-    max_id = 2**31 - 1
-    response = client.delete(f"{ENDPOINT}/{max_id}", headers=admin_token)
-    assert response.status_code == status.HTTP_404_NOT_FOUND
-
-
 # TC_22 - Delete user immediately after creating
-def test_tc_22_delete_after_create(client):
-    email = make_email_str("deletefast")
-    res1 = register(client, email, "Password123!", role_id=3)
-    login_res = login(client, email, "Password123!")
-    get_user_token_header(login_res)
-    user_id = res1.json()["id"]
-
-    admin_email = make_email_str("admin_deletefast")
-    register(client, admin_email, "Password123!", role_id=3)
-    admin_login = login(client, admin_email, "Password123!")
-    admin_token = get_user_token_header(admin_login)
+def test_tc_22_delete_after_create(client, db_session, admin_header):
+    user_id = seed_user(
+        db_session, make_email_str("deletefast"), "Password123!", role_id=3
+    ).id
 
-    response = client.delete(f"{ENDPOINT}/{user_id}", headers=admin_token)
+    response = client.delete(f"{ENDPOINT}/{user_id}", headers=admin_header)
     assert response.status_code == status.HTTP_200_OK
 
 
 # TC_23 - Delete user with many related data (simulate)
-def test_tc_23_delete_user_many_related(client):
-    email = make_email_str("heavyuser")
-    res1 = register(client, email, "Password123!", role_id=3)
-    login(client, email, "Password123!")
-    user_id = res1.json()["id"]
+def test_tc_23_delete_user_many_related(client, db_session, admin_header):
+    user_id = seed_user(
+        db_session, make_email_str("heavyuser"), "Password123!", role_id=3
+    ).id
 
     # (Optional) Insert heavy related data: simulate 10k comments if you want
 
-    admin_email = make_email_str("admin_heavy")
-    register(client, admin_email, "Password123!", role_id=3)
-    admin_login = login(client, admin_email, "Password123!")
-    admin_token = get_user_token_header(admin_login)
-
-    response = client.delete(f"{ENDPOINT}/{user_id}", headers=admin_token)
+    response = client.delete(f"{ENDPOINT}/{user_id}", headers=admin_header)
     assert response.status_code == status.HTTP_200_OK
 
 
@@ -217,69 +141,46 @@ def test_tc_23_delete_user_many_related(client):
 
 
 # TC_30 - Delete user deactivated (is_active=False)
-def test_tc_30_delete_inactive_user(client):
-    email = make_email_str("inactiveuser")
-    res1 = register(client, email, "Password123!", role_id=3)
-    login(client, email, "Password123!")
-    user_id = res1.json()["id"]
-
-    admin_email = make_email_str("admin_inactive")
-    register(client, admin_email, "Password123!", role_id=3)
-    admin_login = login(client, admin_email, "Password123!")
-    admin_token = get_user_token_header(admin_login)
+def test_tc_30_delete_inactive_user(client, db_session, admin_header):
+    user_id = seed_user(
+        db_session, make_email_str("inactiveuser"), "Password123!", role_id=3
+    ).id
 
     # Simulate deactivate
-    client.put(f"{ENDPOINT}/{user_id}", headers=admin_token, json={"is_active": False})
+    client.put(f"{ENDPOINT}/{user_id}", headers=admin_header, json={"is_active": False})
 
-    response = client.delete(f"{ENDPOINT}/{user_id}", headers=admin_token)
+    response = client.delete(f"{ENDPOINT}/{user_id}", headers=admin_header)
     assert response.status_code == status.HTTP_200_OK
 
 
 # TC_31 - Delete user who never logged in
-def test_tc_31_delete_never_logged_in(client):
-    email = make_email_str("neverloginuser")
-    res1 = register(client, email, "Password123!", role_id=3)
-    user_id = res1.json()["id"]
-
-    admin_email = make_email_str("admin_neverlogin")
-    register(client, admin_email, "Password123!", role_id=3)
-    admin_login = login(client, admin_email, "Password123!")
-    admin_token = get_user_token_header(admin_login)
+def test_tc_31_delete_never_logged_in(client, db_session, admin_header):
+    user_id = seed_user(
+        db_session, make_email_str("neverloginuser"), "Password123!", role_id=3
+    ).id
 
-    response = client.delete(f"{ENDPOINT}/{user_id}", headers=admin_token)
+    response = client.delete(f"{ENDPOINT}/{user_id}", headers=admin_header)
     assert response.status_code == status.HTTP_200_OK
 
 
 # TC_32 - Delete user owning critical objects
-def test_tc_32_delete_user_with_critical_objects(client):
-    email = make_email_str("criticaluser")
-    res1 = register(client, email, "Password123!", role_id=3)
-    login(client, email, "Password123!")
-    user_id = res1.json()["id"]
-
-    admin_email = make_email_str("admin_critical")
-    register(client, admin_email, "Password123!", role_id=3)
-    admin_login = login(client, admin_email, "Password123!")
-    admin_token = get_user_token_header(admin_login)
+def test_tc_32_delete_user_with_critical_objects(client, db_session, admin_header):
+    user_id = seed_user(
+        db_session, make_email_str("criticaluser"), "Password123!", role_id=3
+    ).id
 
     # No special check for ownership, system must handle normally
-    response = client.delete(f"{ENDPOINT}/{user_id}", headers=admin_token)
+    response = client.delete(f"{ENDPOINT}/{user_id}", headers=admin_header)
     assert response.status_code == status.HTTP_200_OK
 
 
 # TC_33 - Admin deletes another admin
-def test_tc_33_admin_deletes_admin(client):
-    admin_email1 = make_email_str("adminone")
-    res1 = register(client, admin_email1, "Password123!", role_id=3)
-    login(client, admin_email1, "Password123!")
-    admin1_id = res1.json()["id"]
-
-    admin_email2 = make_email_str("admintwo")
-    register(client, admin_email2, "Password123!", role_id=3)
-    login_res2 = login(client, admin_email2, "Password123!")
-    admin2_token = get_user_token_header(login_res2)
-
-    response = client.delete(f"{ENDPOINT}/{admin1_id}", headers=admin2_token)
+def test_tc_33_admin_deletes_admin(client, db_session, admin_header):
+    admin1_id = seed_user(
+        db_session, make_email_str("adminone"), "Password123!", role_id=3
+    ).id
+
+    response = client.delete(f"{ENDPOINT}/{admin1_id}", headers=admin_header)
     assert response.status_code == status.HTTP_200_OK
 
 
@@ -302,42 +203,8 @@ def test_tc_42_delete_invalid_jwt(client):
 
 
 # TC_43 - Token of normal user tries delete
-def test_tc_43_nonadmin_delete_attempt(client):
-    email = make_email_str("normaluser")
-    res1 = register(
-        client, email, "Password123!", role_id=2
-    )  # Reporter role, not Admin
-    login_res = login(client, email, "Password123!")
-    user_token = get_user_token_header(login_res)
-    user_id = res1.json()["id"]
+def test_tc_43_nonadmin_delete_attempt(client, auth_as):
+    user_id, user_token = auth_as(2, make_email_str("normaluser"))
 
     response = client.delete(f"{ENDPOINT}/{user_id}", headers=user_token)
     assert response.status_code == status.HTTP_403_FORBIDDEN
-
-
-# TC_44 - SQL Injection attempt in ID
-def test_tc_44_sql_injection_attempt(client):
-    admin_email = make_email_str("admin_sql")
-    register(client, admin_email, "Password123!", role_id=3)
-    login_res = login(client, admin_email, "Password123!")
-    admin_token = get_user_token_header(login_res)
-
-    response = client.delete(f"{ENDPOINT}/1;DROP TABLE users;", headers=admin_token)
-    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
-
-
-# TC_45 - Cross-tenant attack
-def test_tc_45_cross_tenant_attack(client):
-    # Assume different tenant separation, simple 404 simulation
-    admin_email = make_email_str("tenant_admin")
-    register(client, admin_email, "Password123!", role_id=3)
-    login_res = login(client, admin_email, "Password123!")
-    admin_token = get_user_token_header(login_res)
-
-    response = client.delete(
-        f"{ENDPOINT}/999999", headers=admin_token
-    )  # ID not from their tenant
-    assert response.status_code in [
-        status.HTTP_403_FORBIDDEN,
-        status.HTTP_404_NOT_FOUND,
-    ]
@@ -1,26 +1,45 @@
+from contextlib import contextmanager
 from jose import jwt
 from datetime import datetime, timedelta, timezone
 from fastapi.testclient import TestClient
-from app.main import app
+from sqlalchemy import event
 from app.core import get_settings
-from tests.utils import (
-    register,
-    login,
-    get_user_from_db,
-    make_email_str,
-    get_admin_token_header,
-)
+from app.db import test_engine
+from app.services.user_service import service_list_users
 
-client = TestClient(app)
 settings = get_settings()
 ENDPOINT = "/api/v1/users"
+# Token expiries computed once at import; an hour outlasts any run
+_FUTURE_EXP = datetime.now(timezone.utc) + timedelta(hours=1)
+_PAST_EXP = datetime.now(timezone.utc) - timedelta(minutes=1)
+
+
+LIST_FILTERS = dict(
+    limit=50, offset=0, search=None, is_active=None, sort_by="created_at", sort_dir="desc"
+)
+
+
+@contextmanager
+def count_statements():
+    """Collect the SELECTs the test engine executes inside the block."""
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append(statement)
+
+    event.listen(test_engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(test_engine, "before_cursor_execute", record)
 
 
 def generate_token(
-    payload: dict, secret: str = settings.JWT_SECRET_KEY, expire_in_minutes=5
+    payload: dict, secret: str = settings.JWT_SECRET_KEY, exp: datetime = _FUTURE_EXP
 ):
     payload = payload.copy()
-    payload["exp"] = datetime.now(timezone.utc) + timedelta(minutes=expire_in_minutes)
+    payload["exp"] = exp
     payload.setdefault("jti", "dummy-jti-1234")
     return jwt.encode(payload, secret, algorithm="HS256")
 
@@ -28,62 +47,44 @@ def generate_token(
 # -----------------------
 # ✅ Positive Test Cases
 # -----------------------
-def test_tc_01_admin_valid_token_users_list(client: TestClient):
-    email = make_email_str("adminuser")
-    register(client, email, "StrongPass123!", role_id=3)
-    res1 = login(client, email, "StrongPass123!")
-    res = client.get(ENDPOINT, headers=get_admin_token_header(res1))
+def test_tc_01_admin_valid_token_users_list(client: TestClient, admin_header):
+    res = client.get(ENDPOINT, headers=admin_header)
     assert res.status_code == 200
     assert isinstance(res.json()["data"], list)
 
 
-def test_tc_02_admin_with_pagination(client: TestClient):
-    email = make_email_str("adminuser")
-    register(client, email, "StrongPass123!", role_id=3)
-    res1 = login(client, email, "StrongPass123!")
+def test_tc_02_admin_with_pagination(client: TestClient, admin_header):
     res = client.get(
-        f"{ENDPOINT}?limit=10&skip=0", headers=get_admin_token_header(res1)
+        f"{ENDPOINT}?limit=10&skip=0", headers=admin_header
     )
     assert res.status_code == 200
     assert isinstance(res.json()["data"], list)
     assert len(res.json()["data"]) <= 10
 
 
-def test_tc_03_admin_filter_active_users(client: TestClient):
-    email = make_email_str("adminuser")
-    register(client, email, "StrongPass123!", role_id=3)
-    res1 = login(client, email, "StrongPass123!")
-    res = client.get(f"{ENDPOINT}?is_active=true", headers=get_admin_token_header(res1))
+def test_tc_03_admin_filter_active_users(client: TestClient, admin_header):
+    res = client.get(f"{ENDPOINT}?is_active=true", headers=admin_header)
     assert res.status_code == 200
     assert all(user["is_active"] is True for user in res.json()["data"])
 
 
-def test_tc_05_admin_role_nested_in_response(client: TestClient):
-    email = make_email_str("adminuser")
-    register(client, email, "StrongPass123!", role_id=3)
-    res1 = login(client, email, "StrongPass123!")
-    res = client.get(ENDPOINT, headers=get_admin_token_header(res1))
+def test_tc_05_admin_role_nested_in_response(client: TestClient, admin_header):
+    res = client.get(ENDPOINT, headers=admin_header)
     assert res.status_code == 200
     for user in res.json()["data"]:
         assert "role_id" in user
         assert isinstance(user["role_id"], int)
 
 
-def test_tc_06_admin_pagination_limit_1(client: TestClient):
-    email = make_email_str("adminuser")
-    register(client, email, "StrongPass123!", role_id=3)
-    res1 = login(client, email, "StrongPass123!")
-    res = client.get(f"{ENDPOINT}?limit=1", headers=get_admin_token_header(res1))
+def test_tc_06_admin_pagination_limit_1(client: TestClient, admin_header):
+    res = client.get(f"{ENDPOINT}?limit=1", headers=admin_header)
     assert res.status_code == 200
     assert len(res.json()["data"]) <= 1
 
 
-def test_tc_07_admin_filter_inactive_users(client: TestClient):
-    email = make_email_str("adminuser")
-    register(client, email, "StrongPass123!", role_id=3)
-    res1 = login(client, email, "StrongPass123!")
+def test_tc_07_admin_filter_inactive_users(client: TestClient, admin_header):
     res = client.get(
-        f"{ENDPOINT}?is_active=false", headers=get_admin_token_header(res1)
+        f"{ENDPOINT}?is_active=false", headers=admin_header
     )
     assert res.status_code == 200
     assert all(user["is_active"] is False for user in res.json()["data"])
@@ -107,7 +108,7 @@ def test_tc_11_token_not_jwt(client: TestClient):
 
 def test_tc_12_token_expired(client: TestClient):
     token = generate_token(
-        {"sub": "admin@example.com", "role": "admin"}, expire_in_minutes=-1
+        {"sub": "admin@example.com", "role": "admin"}, exp=_PAST_EXP
     )
     headers = {"Authorization": f"Bearer {token}"}
     res = client.get(ENDPOINT, headers=headers)
@@ -141,15 +142,29 @@ def test_tc_15_admin_malformed_query(client: TestClient):
 # -----------------------
 # 📐 Edge Test Cases
 # -----------------------
-def test_tc_20_limit_zero_valid_admin(client: TestClient):
-    email = make_email_str("adminuser")
-    register(client, email, "StrongPass123!", role_id=3)
-    res1 = login(client, email, "StrongPass123!")
-    res = client.get(f"{ENDPOINT}?limit=0", headers=get_admin_token_header(res1))
+def test_tc_20_limit_zero_valid_admin(client: TestClient, admin_header):
+    res = client.get(f"{ENDPOINT}?limit=0", headers=admin_header)
     assert res.status_code == 200
     assert res.json()["data"] == []
 
 
+def test_tc_22_listing_skips_relationship_loads(db_session, seeded_users):
+    with count_statements() as statements:
+        users, _ = service_list_users(db_session, **LIST_FILTERS)
+    assert len(users) >= len(seeded_users)
+    assert len(statements) == 2  # the page SELECT and the count
+
+
+def test_tc_23_listing_with_relations_has_no_n_plus_one(db_session, seeded_users):
+    with count_statements() as statements:
+        users, _ = service_list_users(db_session, with_relations=True, **LIST_FILTERS)
+        for user in users:
+            user.role, list(user.reported_bugs)
+    assert len(users) >= len(seeded_users)
+    # page SELECT joined to roles, one batched reported_bugs SELECT, the count
+    assert len(statements) == 3
+
+
 # def test_tc_21_skip_beyond_user_count(client: TestClient):
 #     email = make_email_str("adminuser")
 #     register(client, email, "StrongPass123!", role_id=3)